@@ -1,11 +1,10 @@
+import binascii
 import datetime
 import inspect
-import itertools
 import logging
-import re
+import os
 import time
 import traceback
-import uuid
 import warnings
 
 from collections import OrderedDict
@@ -33,6 +32,7 @@ from huey.storage import RedisExpireStorage
 from huey.storage import RedisStorage
 from huey.storage import SqliteStorage
 from huey.utils import Error
+from huey.utils import Raw
 from huey.utils import normalize_expire_time
 from huey.utils import normalize_time
 from huey.utils import reraise_as
@@ -44,6 +44,7 @@ from huey.utils import utcnow
 
 logger = logging.getLogger('huey')
 _sentinel = object()
+_epoch = datetime.datetime.fromtimestamp(0)
 
 
 class Huey(object):
@@ -116,13 +117,18 @@ class Huey(object):
         if storage_class is not None:
             self.storage_class = storage_class
         self.storage = self.create_storage()
+        self._live_storage = None
 
         # Allow overriding the default TaskWrapper implementation.
         self.task_wrapper_class = self.get_task_wrapper_class()
 
-        self._locks = set()
+        self._locks = {}  # Lock name -> storage key.
         self._pre_execute = OrderedDict()
         self._post_execute = OrderedDict()
+        # Snapshots of the pre- and post-execute hooks, which are iterated for
+        # every task that is executed. Rebuilt whenever a hook is registered.
+        self._pre_execute_seq = ()
+        self._post_execute_seq = ()
         self._startup = OrderedDict()
         self._shutdown = OrderedDict()
         self._registry = Registry()
@@ -163,15 +169,24 @@ class Huey(object):
         if self._immediate != value:
             self._immediate = value
             # If we are using different storage engines for immediate-mode
-            # versus normal mode, we need to recreate the storage engine.
+            # versus normal mode, we need to swap the storage engine. The live
+            # storage is kept, rather than recreated, so that its connections
+            # can be reused when immediate mode is disabled again.
             if self.immediate_use_memory:
-                self.storage = self.create_storage()
+                if value:
+                    self._live_storage = self.storage
+                    self.storage = self.create_storage()
+                elif self._live_storage is not None:
+                    self.storage = self._live_storage
+                    self._live_storage = None
+                else:
+                    self.storage = self.create_storage()
 
     def create_consumer(self, **options):
         return Consumer(self, **options)
 
     def task(self, retries=0, retry_delay=0, priority=None, context=False,
-             name=None, expires=None, **kwargs):
+             name=None, expires=None, results=True, **kwargs):
         TaskWrapper = self.task_wrapper_class
         def decorator(func):
             return TaskWrapper(
@@ -183,6 +198,7 @@ class Huey(object):
                 default_retry_delay=retry_delay,
                 default_priority=priority,
                 default_expires=expires,
+                results=results,
                 **kwargs)
         return decorator
 
@@ -226,6 +242,7 @@ class Huey(object):
     def pre_execute(self, name=None):
         def decorator(fn):
             self._pre_execute[name or fn.__name__] = fn
+            self._pre_execute_seq = tuple(self._pre_execute.items())
             return fn
         return decorator
 
@@ -233,11 +250,14 @@ class Huey(object):
         if not isinstance(name, string_type):
             # Assume we were given the function itself.
             name = name.__name__
-        return self._pre_execute.pop(name, None) is not None
+        ret = self._pre_execute.pop(name, None) is not None
+        self._pre_execute_seq = tuple(self._pre_execute.items())
+        return ret
 
     def post_execute(self, name=None):
         def decorator(fn):
             self._post_execute[name or fn.__name__] = fn
+            self._post_execute_seq = tuple(self._post_execute.items())
             return fn
         return decorator
 
@@ -245,7 +265,9 @@ class Huey(object):
         if not isinstance(name, string_type):
             # Assume we were given the function itself.
             name = name.__name__
-        return self._post_execute.pop(name, None) is not None
+        ret = self._post_execute.pop(name, None) is not None
+        self._post_execute_seq = tuple(self._post_execute.items())
+        return ret
 
     def on_startup(self, name=None):
         def decorator(fn):
@@ -286,6 +308,10 @@ class Huey(object):
         self._signal.disconnect(receiver, *signals)
 
     def _emit(self, signal, task, *args, **kwargs):
+        # Signals are sent several times for every task, so avoid doing any
+        # work when nothing is listening.
+        if not self._signal.has_receivers(signal):
+            return
         try:
             self._signal.send(signal, task, *args, **kwargs)
         except Exception as exc:
@@ -309,17 +335,40 @@ class Huey(object):
         else:
             self.storage.enqueue(self.serialize_task(task), task.priority)
 
+        return self._enqueued_result(task)
+
+    def enqueue_many(self, tasks):
+        tasks = list(tasks)
+        if self._immediate:
+            # Tasks are executed synchronously, so there is nothing to batch.
+            return [self.enqueue(task) for task in tasks]
+
+        for task in tasks:
+            if task.expires:
+                task.resolve_expires(self.utc)
+
+        # Serialize everything up-front so the storage can write all the tasks
+        # in a single operation (e.g. one round-trip to Redis).
+        self.storage.enqueue_many([(self.serialize_task(task), task.priority)
+                                   for task in tasks])
+        return [self._enqueued_result(task) for task in tasks]
+
+    def _enqueued_result(self, task):
         if not self.results:
             return
 
         if task.on_complete:
+            # Steps of a pipeline declared with results=False do not store
+            # their return value, so there is nothing for them to wait on.
             current = task
             results = []
             while current is not None:
-                results.append(Result(self, current))
+                if current.results:
+                    results.append(Result(self, current))
                 current = current.on_complete
-            return ResultGroup(results)
-        else:
+            if results:
+                return ResultGroup(results)
+        elif task.results:
             return Result(self, task)
 
     def dequeue(self):
@@ -328,9 +377,13 @@ class Huey(object):
             return self.deserialize_task(data)
 
     def put(self, key, data):
+        if isinstance(data, Raw):
+            return self.storage.put_data(key, data.data)
         return self.storage.put_data(key, self.serializer.serialize(data))
 
     def put_result(self, key, data):
+        if isinstance(data, Raw):
+            return self.storage.put_data(key, data.data, is_result=True)
         return self.storage.put_data(key, self.serializer.serialize(data),
                                      is_result=True)
 
@@ -356,7 +409,9 @@ class Huey(object):
                 datetime.datetime.now())
 
     def execute(self, task, timestamp=None):
-        if timestamp is None:
+        # The current time is only needed to check the eta and expiration.
+        # Revocation checks will resolve the time themselves, if necessary.
+        if timestamp is None and (task.eta or task.expires_resolved):
             timestamp = self._get_timestamp()
 
         if not self.ready_to_run(task, timestamp):
@@ -373,7 +428,7 @@ class Huey(object):
             return self._execute(task, timestamp)
 
     def _execute(self, task, timestamp):
-        if self._pre_execute:
+        if self._pre_execute_seq:
             try:
                 self._run_pre_execute(task)
             except CancelExecution:
@@ -424,19 +479,27 @@ class Huey(object):
             logger.info('%s executed in %0.3fs', task, duration)
 
         # Clear the flag if this instance of the task was revoked after it
-        # began executing by destructively reading it's revoke key.
+        # began executing by deleting it's revoke key.
         if not isinstance(task, PeriodicTask):
-            self.get(task.revoke_id)
+            self.delete(task.revoke_id)
 
-        if self.results and not isinstance(task, PeriodicTask):
+        if self.results and task.results and \
+           not isinstance(task, PeriodicTask):
             if exception is not None:
                 error_data = self.build_error_result(task, exception)
                 self.put_result(task.id, Error(error_data))
             elif task_value is not None or self.store_none:
                 self.put_result(task.id, task_value)
 
-        if self._post_execute:
-            self._run_post_execute(task, task_value, exception)
+        # Hooks and pipeline continuations receive the value itself, rather
+        # than pre-serialized data. Deserialize it only when it is needed.
+        value = task_value
+        if isinstance(value, Raw) and \
+           (self._post_execute_seq or task.on_complete):
+            value = self.serializer.deserialize(value.data)
+
+        if self._post_execute_seq:
+            self._run_post_execute(task, value, exception)
 
         if exception is None:
             # Task executed successfully, send the COMPLETE signal.
@@ -444,7 +507,7 @@ class Huey(object):
 
         if task.on_complete and exception is None:
             next_task = task.on_complete
-            next_task.extend_data(task_value)
+            next_task.extend_data(value)
             self.enqueue(next_task)
         elif task.on_error and exception is not None:
             next_task = task.on_error
@@ -453,17 +516,19 @@ class Huey(object):
 
         if exception is not None and task.retries:
             self._emit(S.SIGNAL_RETRYING, task)
-            self._requeue_task(task, self._get_timestamp(), retry_eta)
+            self._requeue_task(task, retry_eta=retry_eta)
 
         return task_value
 
-    def _requeue_task(self, task, timestamp, retry_eta=None):
+    def _requeue_task(self, task, timestamp=None, retry_eta=None):
         task.retries -= 1
         logger.info('Requeueing %s, %s retries', task.id, task.retries)
         if retry_eta is not None:
             task.eta = retry_eta
             self.add_schedule(task)
         elif task.retry_delay:
+            if timestamp is None:
+                timestamp = self._get_timestamp()
             delay = datetime.timedelta(seconds=task.retry_delay)
             task.eta = timestamp + delay
             self.add_schedule(task)
@@ -471,7 +536,7 @@ class Huey(object):
             self.enqueue(task)
 
     def _run_pre_execute(self, task):
-        for name, callback in self._pre_execute.items():
+        for name, callback in self._pre_execute_seq:
             logger.debug('Pre-execute hook %s for %s.', name, task)
             try:
                 callback(task)
@@ -484,7 +549,7 @@ class Huey(object):
                                  'hook %s for %s.', name, task)
 
     def _run_post_execute(self, task, task_value, exception):
-        for name, callback in self._post_execute.items():
+        for name, callback in self._post_execute_seq:
             logger.debug('Post-execute hook %s for %s.', name, task)
             try:
                 callback(task, task_value, exception)
@@ -493,8 +558,18 @@ class Huey(object):
                                  'hook %s for %s.', name, task)
 
     def build_error_result(self, task, exception):
+        # This is called after the except block in _execute() has exited, at
+        # which point Python 3 has already cleared sys.exc_info(), so format
+        # the traceback attached to the exception itself where available. Only
+        # the innermost frames are kept, to bound the cost of formatting and
+        # the size of the stored result for deeply-recursive failures.
+        exc_tb = getattr(exception, '__traceback__', None)
         try:
-            tb = traceback.format_exc()
+            if exc_tb is not None:
+                tb = ''.join(traceback.format_exception(
+                    type(exception), exception, exc_tb, limit=-50))
+            else:
+                tb = traceback.format_exc()
         except AttributeError:  # Seems to only happen on 3.4.
             tb = '- unable to resolve traceback on Python 3.4 -'
 
@@ -511,7 +586,7 @@ class Huey(object):
         }
 
     def _task_key(self, task_class, key):
-        return ':'.join((key, self._registry.task_to_string(task_class)))
+        return self._registry.task_key(task_class, key)
 
     def revoke_all(self, task_class, revoke_until=None, revoke_once=False):
         if isinstance(task_class, TaskWrapper):
@@ -547,11 +622,14 @@ class Huey(object):
         1. Is task revoked?
         2. Should task be restored?
         """
-        res = self.get(revoke_id, peek=True)
-        if res is None:
+        data = self.get_raw(revoke_id, peek=True)
+        return self._check_revoked_data(data, timestamp, peek)
+
+    def _check_revoked_data(self, data, timestamp=None, peek=True):
+        if data is EmptyData:
             return False, False
 
-        revoke_until, revoke_once = res
+        revoke_until, revoke_once = self.serializer.deserialize(data)
         if revoke_until is not None and timestamp is None:
             timestamp = self._get_timestamp()
 
@@ -582,18 +660,28 @@ class Huey(object):
             # Assume we've been given a task ID.
             task = Task(id=task)
 
-        key = task.revoke_id
-        is_revoked, can_restore = self._check_revoked(key, timestamp, peek)
+        # Read the revocation data for the task instance and the task class in
+        # a single operation, then check the instance before the class.
+        task_class = type(task)
+        data, class_data = self.storage.peek_data_many([
+            task.revoke_id,
+            self._task_key(task_class, 'rt')])
+
+        is_revoked, can_restore = self._check_revoked_data(data, timestamp,
+                                                           peek)
         if can_restore:
             self.restore(task)
         if not is_revoked:
-            is_revoked = self.is_revoked(type(task), timestamp, peek)
+            is_revoked, can_restore = self._check_revoked_data(
+                class_data, timestamp, peek)
+            if can_restore:
+                self.restore_all(task_class)
 
         return is_revoked
 
     def add_schedule(self, task):
         data = self.serialize_task(task)
-        eta = task.eta or datetime.datetime.fromtimestamp(0)
+        eta = task.eta or _epoch
         self.storage.add_to_schedule(data, eta, self.utc)
         logger.info('Added task %s to schedule, eta %s', task.id, eta)
         self._emit(S.SIGNAL_SCHEDULED, task)
@@ -611,9 +699,11 @@ class Huey(object):
                 if task.validate_datetime(timestamp)]
 
     def ready_to_run(self, task, timestamp=None):
+        if task.eta is None:
+            return True
         if timestamp is None:
             timestamp = self._get_timestamp()
-        return task.eta is None or task.eta <= timestamp
+        return task.eta <= timestamp
 
     def pending(self, limit=None):
         return [self.deserialize_task(task)
@@ -652,12 +742,14 @@ class Huey(object):
         locks = self._locks
         if names:
             lock_template = '%s.lock.%%s' % self.name
-            named_locks = (lock_template % name.strip() for name in names)
-            locks = itertools.chain(locks, named_locks)
+            locks = dict(locks)
+            for name in names:
+                name = name.strip()
+                locks[name] = lock_template % name
 
-        for lock_key in locks:
+        for name, lock_key in locks.items():
             if self.delete(lock_key):
-                flushed.add(lock_key.split('.lock.', 1)[-1])
+                flushed.add(name)
 
         return flushed
 
@@ -677,11 +769,18 @@ class Huey(object):
 
 
 class Task(object):
+    __slots__ = ('name', 'args', 'kwargs', 'id', 'revoke_id', 'eta', 'retries',
+                 'retry_delay', 'priority', 'expires', 'expires_resolved',
+                 'on_complete', 'on_error')
+
     default_expires = None
     default_priority = None
     default_retries = 0
     default_retry_delay = 0
 
+    # Whether the return value of the task is stored in the result store.
+    results = True
+
     def __init__(self, args=None, kwargs=None, id=None, eta=None, retries=None,
                  retry_delay=None, priority=None, expires=None,
                  on_complete=None, on_error=None, expires_resolved=None):
@@ -729,7 +828,9 @@ class Task(object):
         return hash(self.id)
 
     def create_id(self):
-        return str(uuid.uuid4())
+        # 128 random bits, at least as many as a uuid4 (which has 122), without
+        # the overhead of constructing and formatting a UUID for every task.
+        return binascii.hexlify(os.urandom(16)).decode('ascii')
 
     def resolve_expires(self, utc=True):
         if self.expires:
@@ -789,6 +890,8 @@ class Task(object):
 
 
 class PeriodicTask(Task):
+    __slots__ = ()
+
     def validate_datetime(self, timestamp):
         return False
 
@@ -818,12 +921,13 @@ class TaskWrapper(object):
 
     def create_task(self, func, context=False, name=None, **settings):
         def execute(self):
-            args, kwargs = self.data
+            kwargs = self.kwargs
             if self.context:
                 kwargs['task'] = self
-            return func(*args, **kwargs)
+            return func(*self.args, **kwargs)
 
         attrs = {
+            '__slots__': (),
             'context': context,
             'execute': execute,
             '__module__': func.__module__,
@@ -877,7 +981,7 @@ class TaskWrapper(object):
         return [self.s(*(i if isinstance(i, tuple) else (i,))) for i in it]
 
     def map(self, it):
-        return ResultGroup([self.huey.enqueue(t) for t in self._apply(it)])
+        return ResultGroup(self.huey.enqueue_many(self._apply(it)))
 
     def __call__(self, *args, **kwargs):
         return self.huey.enqueue(self.s(*args, **kwargs))
@@ -906,11 +1010,13 @@ class TaskLock(object):
     Utilize the Storage key/value APIs to implement simple locking. For more
     details see :py:meth:`Huey.lock_task`.
     """
+    __slots__ = ('_huey', '_name', '_key')
+
     def __init__(self, huey, name):
         self._huey = huey
         self._name = name
         self._key = '%s.lock.%s' % (self._huey.name, self._name)
-        self._huey._locks.add(self._key)
+        self._huey._locks[self._name] = self._key
 
     def is_locked(self):
         return self._huey.storage.has_data_for_key(self._key)
@@ -956,6 +1062,8 @@ class Result(object):
         result2 = my_task(2, 3)
         print result(blocking=True, timeout=4)
     """
+    __slots__ = ('huey', 'task', 'revoke_id', '_result')
+
     def __init__(self, huey, task):
         self.huey = huey
         self.task = task
@@ -1002,7 +1110,10 @@ class Result(object):
                 if delay > max_delay:
                     delay = max_delay
                 if self._get(preserve) is EmptyData:
-                    time.sleep(delay)
+                    remaining = None
+                    if timeout:
+                        remaining = timeout - (time_clock() - start)
+                    self.huey.storage.wait_for_data(self.id, delay, remaining)
                     delay *= backoff
 
             return self._result
@@ -1056,6 +1167,8 @@ class Result(object):
 
 
 class ResultGroup(object):
+    __slots__ = ('_results',)
+
     def __init__(self, results):
         self._results = results
 
@@ -1083,28 +1196,16 @@ class ResultGroup(object):
                 yield r.get()
 
 
-dash_re = re.compile(r'(\d+)-(\d+)')
-every_re = re.compile(r'\*\/(\d+)')
-
-
-def crontab(minute='*', hour='*', day='*', month='*', day_of_week='*', strict=False):
-    """
-    Convert a "crontab"-style set of parameters into a test function that will
-    return True when the given datetime matches the parameters set forth in
-    the crontab.
-
-    For day-of-week, 0=Sunday and 6=Saturday.
+def _digit_prefix(s):
+    # Return the leading run of digits in the string. Trailing characters
+    # have always been ignored for ranges and intervals, e.g. "1-5x".
+    for i, c in enumerate(s):
+        if not c.isdigit():
+            return s[:i]
+    return s
 
-    Acceptable inputs:
-    * = every distinct value
-    */n = run every "n" times, i.e. hours='*/4' == 0, 4, 8, 12, 16, 20
-    m-n = run every time m..n
-    m,n = run on m and n
 
-    The strict parameter will cause crontab to raise a ValueError if an input
-    does not match a supported crontab input format. This provides backwards
-    compatibility.
-    """
+def _parse_crontab(minute, hour, day, month, day_of_week, strict):
     validation = (
         ('m', month, range(1, 13)),
         ('d', day, range(1, 32)),
@@ -1117,9 +1218,6 @@ def crontab(minute='*', hour='*', day='*', month='*', day_of_week='*', strict=Fa
     for (date_str, value, acceptable) in validation:
         settings = set([])
 
-        if isinstance(value, int):
-            value = str(value)
-
         for piece in value.split(','):
             if piece == '*':
                 settings.update(acceptable)
@@ -1134,9 +1232,10 @@ def crontab(minute='*', hour='*', day='*', month='*', day_of_week='*', strict=Fa
                 settings.add(piece)
                 continue
 
-            dash_match = dash_re.match(piece)
-            if dash_match:
-                lhs, rhs = map(int, dash_match.groups())
+            lhs, dash, rhs = piece.partition('-')
+            rhs = _digit_prefix(rhs)
+            if dash and lhs.isdigit() and rhs:
+                lhs, rhs = int(lhs), int(rhs)
                 if lhs not in acceptable or rhs not in acceptable:
                     raise ValueError('%s is not a valid input' % piece)
                 elif date_str == 'w':
@@ -1146,32 +1245,96 @@ def crontab(minute='*', hour='*', day='*', month='*', day_of_week='*', strict=Fa
                 continue
 
             # Handle stuff like */3, */6.
-            every_match = every_re.match(piece)
-            if every_match:
+            interval = piece.startswith('*/') and _digit_prefix(piece[2:])
+            if interval:
                 if date_str == 'w':
                     raise ValueError('Cannot perform this kind of matching'
                                      ' on day-of-week.')
-                interval = int(every_match.groups()[0])
-                settings.update(acceptable[::interval])
+                settings.update(acceptable[::int(interval)])
                 continue
 
             # Older versions of Huey would, at this point, ignore the unmatched piece.
             if strict:
                 raise ValueError('%s is not a valid input' % piece)
 
-        cron_settings.append(sorted(list(settings)))
+        cron_settings.append(frozenset(settings))
 
-    def validate_date(timestamp):
-        _, m, d, H, M, _, w, _, _ = timestamp.timetuple()
+    # Encode each field as a bitmask, so that checking a date-piece is a
+    # shift and bitwise-and rather than a membership test.
+    return tuple(sum(1 << value for value in selection)
+                 for selection in cron_settings)
+
+
+_crontab_masks = {}
+
+# Masks matching every possible value of each field, in the same order as the
+# parsed masks: month, day, day-of-week (Sunday=0), hour and minute.
+_crontab_full = tuple(sum(1 << value for value in acceptable) for acceptable in
+                      (range(1, 13), range(1, 32), range(7), range(24),
+                       range(60)))
+
+
+def crontab(minute='*', hour='*', day='*', month='*', day_of_week='*', strict=False):
+    """
+    Convert a "crontab"-style set of parameters into a test function that will
+    return True when the given datetime matches the parameters set forth in
+    the crontab.
 
-        # fix the weekday to be sunday=0
-        w = (w + 1) % 7
+    For day-of-week, 0=Sunday and 6=Saturday.
+
+    Acceptable inputs:
+    * = every distinct value
+    */n = run every "n" times, i.e. hours='*/4' == 0, 4, 8, 12, 16, 20
+    m-n = run every time m..n
+    m,n = run on m and n
+
+    The strict parameter will cause crontab to raise a ValueError if an input
+    does not match a supported crontab input format. This provides backwards
+    compatibility.
+    """
+    # Periodic tasks commonly share schedules, so reuse the parsed masks.
+    key = tuple(str(value) if isinstance(value, int) else value
+                for value in (minute, hour, day, month, day_of_week))
+    key += (bool(strict),)
+    try:
+        masks = _crontab_masks[key]
+    except KeyError:
+        masks = _parse_crontab(*key)
+        if len(_crontab_masks) >= 256:
+            _crontab_masks.clear()
+        _crontab_masks[key] = masks
+
+    m_mask, d_mask, w_mask, H_mask, M_mask = masks
+
+    # Specialize the common schedules that only constrain the time of day,
+    # e.g. "every minute", "every 5 minutes" or "daily at 3am", so that fields
+    # accepting every value are not checked at all.
+    m_full, d_full, w_full, H_full, M_full = [
+        mask & full == full for mask, full in zip(masks, _crontab_full)]
+    if m_full and d_full and w_full:
+        if H_full and M_full:
+            def validate_date(timestamp):
+                return True
+        elif H_full:
+            def validate_date(timestamp):
+                return bool((M_mask >> timestamp.minute) & 1)
+        else:
+            def validate_date(timestamp):
+                return bool((M_mask >> timestamp.minute) &
+                            (H_mask >> timestamp.hour) & 1)
+        return validate_date
+
+    def validate_date(timestamp):
+        # The scheduler checks every minute, so most calls can be rejected by
+        # the minute alone. Test it before the coarser fields.
+        if not (M_mask >> timestamp.minute) & 1:
+            return False
 
-        for (date_piece, selection) in zip((m, d, w, H, M), cron_settings):
-            if date_piece not in selection:
-                return False
+        # isoweekday() is Monday=1 through Sunday=7, we want Sunday=0.
+        w = timestamp.isoweekday() % 7
 
-        return True
+        return bool((H_mask >> timestamp.hour) & (w_mask >> w) &
+                    (d_mask >> timestamp.day) & (m_mask >> timestamp.month) & 1)
 
     return validate_date
 
@@ -18,7 +18,7 @@ class RedisSemaphore(object):
         self.value = value
         self.timeout = timeout or 86400  # Set a max age for lock holders.
 
-        self.huey._locks.add(self.key)
+        self.huey._locks[name] = self.key
         self._conn = self.huey.storage.conn
 
     def acquire(self, name=None):
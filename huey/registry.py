@@ -17,9 +17,26 @@ class Registry(object):
     def __init__(self):
         self._registry = {}
         self._periodic_tasks = []
+        self._task_strings = {}
+        self._task_keys = {}
 
     def task_to_string(self, task_class):
-        return '%s.%s' % (task_class.__module__, task_class.__name__)
+        # Identifiers of registered tasks are computed once, at registration.
+        try:
+            return self._task_strings[task_class]
+        except KeyError:
+            return '%s.%s' % (task_class.__module__, task_class.__name__)
+
+    def task_key(self, task_class, key):
+        # Storage keys for class-level flags, such as revocation, are checked
+        # for every task executed, so cache them for registered tasks.
+        try:
+            return self._task_keys[task_class, key]
+        except KeyError:
+            task_key = ':'.join((key, self.task_to_string(task_class)))
+            if task_class in self._task_strings:
+                self._task_keys[task_class, key] = task_key
+            return task_key
 
     def register(self, task_class):
         task_str = self.task_to_string(task_class)
@@ -29,6 +46,7 @@ class Registry(object):
                              ' name= to register this task. "%s"' % task_str)
 
         self._registry[task_str] = task_class
+        self._task_strings[task_class] = task_str
         if hasattr(task_class, 'validate_datetime'):
             self._periodic_tasks.append(task_class)
         return True
@@ -39,6 +57,9 @@ class Registry(object):
             return False
 
         del self._registry[task_str]
+        self._task_strings.pop(task_class, None)
+        for cache_key in [k for k in self._task_keys if k[0] is task_class]:
+            del self._task_keys[cache_key]
         if hasattr(task_class, 'validate_datetime'):
             self._periodic_tasks = [t for t in self._periodic_tasks
                                     if t is not task_class]
@@ -50,9 +71,11 @@ class Registry(object):
         return self._registry[task_str]
 
     def create_message(self, task):
-        task_str = self.task_to_string(type(task))
-        if task_str not in self._registry:
-            raise HueyException('%s not found in TaskRegistry' % task_str)
+        # Only registered task classes have a cached identifier.
+        task_str = self._task_strings.get(type(task))
+        if task_str is None:
+            raise HueyException('%s not found in TaskRegistry' %
+                                self.task_to_string(type(task)))
 
         # Remove the "task" instance from any arguments before serializing.
         if task.kwargs and 'task' in task.kwargs:
@@ -112,4 +135,4 @@ class Registry(object):
 
     @property
     def periodic_tasks(self):
-        return [task_class() for task_class in self._periodic_tasks]
+        return (task_class() for task_class in self._periodic_tasks)
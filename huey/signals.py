@@ -35,6 +35,9 @@ class Signal(object):
             except ValueError:
                 pass
 
+    def has_receivers(self, signal):
+        return bool(self.receivers['any'] or self.receivers.get(signal))
+
     def send(self, signal, task, *args, **kwargs):
         receivers = itertools.chain(self.receivers.get(signal, ()),
                                     self.receivers['any'])
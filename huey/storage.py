@@ -30,6 +30,7 @@ except ImportError:
 from huey.constants import EmptyData
 from huey.exceptions import ConfigurationError
 from huey.utils import FileLock
+from huey.utils import encode
 from huey.utils import text_type
 from huey.utils import to_timestamp
 
@@ -65,6 +66,18 @@ class BaseStorage(object):
         """
         raise NotImplementedError
 
+    def enqueue_many(self, items):
+        """
+        Add multiple opaque chunks of data to the queue. The default
+        implementation calls :py:meth:`enqueue` for each item, storage
+        implementations may override this to write all the items at once.
+
+        :param items: A list of ``(data, priority)`` 2-tuples.
+        :return: No return value.
+        """
+        for data, priority in items:
+            self.enqueue(data, priority)
+
     def dequeue(self):
         """
         Atomically remove data from the queue. If no data is available, no data
@@ -169,6 +182,18 @@ class BaseStorage(object):
         """
         raise NotImplementedError
 
+    def peek_data_many(self, keys):
+        """
+        Non-destructively read the values at the given keys. The default
+        implementation calls :py:meth:`peek_data` for each key, storage
+        implementations may override this to read all the keys at once.
+
+        :param list keys: Keys to read.
+        :return: List of values, in the same order as the keys. Missing keys
+            are indicated by ``EmptyData``.
+        """
+        return [self.peek_data(key) for key in keys]
+
     def pop_data(self, key):
         """
         Destructively read the value at the given key, if it exists.
@@ -187,6 +212,24 @@ class BaseStorage(object):
         """
         return self.pop_data(key) is not EmptyData
 
+    def wait_for_data(self, key, delay, timeout=None):
+        """
+        Wait for data to be written to the given key. Used when blocking on a
+        task result, in-between checking whether the result is ready.
+
+        The default implementation sleeps for ``delay`` seconds, after which
+        the caller checks for the data again. Storage implementations that are
+        notified when data is written may instead wait until the data is
+        written or ``timeout`` seconds have elapsed.
+
+        :param bytes key: Key to wait for.
+        :param float delay: Number of seconds to wait before checking again.
+        :param float timeout: Maximum number of seconds to wait, or ``None``
+            to wait indefinitely.
+        :return: No return value.
+        """
+        time.sleep(delay)
+
     def has_data_for_key(self, key):
         """
         Return whether there is data for the given key.
@@ -243,6 +286,7 @@ class BaseStorage(object):
 
 class BlackHoleStorage(BaseStorage):
     def enqueue(self, data, priority=None): pass
+    def enqueue_many(self, items): pass
     def dequeue(self): pass
     def queue_size(self): return 0
     def enqueued_items(self, limit=None): return []
@@ -276,6 +320,13 @@ class MemoryStorage(BaseStorage):
             priority = 0 if priority is None else -priority
             heapq.heappush(self._queue, (priority, self._c, data))
 
+    def enqueue_many(self, items):
+        with self._lock:
+            for data, priority in items:
+                self._c += 1
+                priority = 0 if priority is None else -priority
+                heapq.heappush(self._queue, (priority, self._c, data))
+
     def dequeue(self):
         try:
             _, _, data = heapq.heappop(self._queue)
@@ -330,6 +381,9 @@ class MemoryStorage(BaseStorage):
     def peek_data(self, key):
         return self._results.get(key, EmptyData)
 
+    def peek_data_many(self, keys):
+        return [self._results.get(key, EmptyData) for key in keys]
+
     def pop_data(self, key):
         return self._results.pop(key, EmptyData)
 
@@ -363,7 +417,7 @@ class RedisStorage(BaseStorage):
 
     def __init__(self, name='huey', blocking=True, read_timeout=1,
                  connection_pool=None, url=None, client_name=None,
-                 **connection_params):
+                 notify_results=False, **connection_params):
 
         if Redis is None:
             raise ConfigurationError('"redis" python module not found, cannot '
@@ -403,6 +457,11 @@ class RedisStorage(BaseStorage):
         self.blocking = blocking
         self.read_timeout = read_timeout
 
+        # When enabled, writing a task result also publishes a message, which
+        # allows clients blocking on the result to wake up immediately.
+        self.notify_results = notify_results
+        self.notify_prefix = encode('huey.notify.%s.' % self.name)
+
     def clean_name(self, name):
         return re.sub('[^a-z0-9]', '', name)
 
@@ -415,6 +474,15 @@ class RedisStorage(BaseStorage):
                                       'this storage.')
         self.conn.lpush(self.queue_key, data)
 
+    def enqueue_many(self, items):
+        if any(priority for _, priority in items):
+            raise NotImplementedError('Task priorities are not supported by '
+                                      'this storage.')
+        if items:
+            # LPUSH with multiple values pushes them left-to-right, so the
+            # items will be dequeued in the order they were given.
+            self.conn.lpush(self.queue_key, *[data for data, _ in items])
+
     def dequeue(self):
         if self.blocking:
             try:
@@ -459,7 +527,13 @@ class RedisStorage(BaseStorage):
         self.conn.delete(self.schedule_key)
 
     def put_data(self, key, value, is_result=False):
-        self.conn.hset(self.result_key, key, value)
+        if is_result and self.notify_results:
+            pipe = self.conn.pipeline()
+            pipe.hset(self.result_key, key, value)
+            pipe.publish(self.notify_prefix + encode(key), b'1')
+            pipe.execute()
+        else:
+            self.conn.hset(self.result_key, key, value)
 
     def peek_data(self, key):
         pipe = self.conn.pipeline()
@@ -468,6 +542,13 @@ class RedisStorage(BaseStorage):
         exists, val = pipe.execute()
         return EmptyData if not exists else val
 
+    def peek_data_many(self, keys):
+        if not keys:
+            return []
+        # HMGET returns None for fields that do not exist.
+        return [EmptyData if val is None else val
+                for val in self.conn.hmget(self.result_key, keys)]
+
     def pop_data(self, key):
         pipe = self.conn.pipeline()
         pipe.hexists(self.result_key, key)
@@ -476,6 +557,31 @@ class RedisStorage(BaseStorage):
         exists, val, n = pipe.execute()
         return EmptyData if not exists else val
 
+    def wait_for_data(self, key, delay, timeout=None):
+        if not self.notify_results:
+            return super(RedisStorage, self).wait_for_data(key, delay, timeout)
+
+        # Wait for the remainder of the timeout on a single subscription. The
+        # key is still re-checked periodically, in case the result is written
+        # by a process that does not publish notifications.
+        deadline = None if timeout is None else time.time() + timeout
+        interval = min(delay, self.read_timeout or 1)
+        pubsub = self.conn.pubsub()
+        try:
+            pubsub.subscribe(self.notify_prefix + encode(key))
+            while not self.has_data_for_key(key):
+                wait = interval
+                if deadline is not None:
+                    wait = min(wait, deadline - time.time())
+                    if wait <= 0:
+                        return
+                msg = pubsub.get_message(ignore_subscribe_messages=True,
+                                         timeout=wait)
+                if msg is not None:
+                    return
+        finally:
+            pubsub.close()
+
     def has_data_for_key(self, key):
         return self.conn.hexists(self.result_key, key)
 
@@ -509,7 +615,14 @@ class RedisExpireStorage(RedisStorage):
         if is_result:
             # We only want to expire task result data. If we are storing an
             # important metadata like a revocation key, we need to preserve it.
-            self.conn.setex(self.result_key(key), self._expire_time, value)
+            if self.notify_results:
+                pipe = self.conn.pipeline()
+                pipe.setex(self.result_key(key), self._expire_time, value)
+                pipe.publish(self.notify_prefix + encode(key), b'1')
+                pipe.execute()
+            else:
+                self.conn.setex(self.result_key(key), self._expire_time,
+                                value)
         else:
             self.conn.set(self.result_key(key), value)
 
@@ -520,6 +633,12 @@ class RedisExpireStorage(RedisStorage):
         exists, val = pipe.execute()
         return EmptyData if not exists else val
 
+    def peek_data_many(self, keys):
+        if not keys:
+            return []
+        return [EmptyData if val is None else val for val in
+                self.conn.mget([self.result_key(key) for key in keys])]
+
     # Here we explicitly prevent result items from being removed by using the
     # same implementation for "pop" (get and delete) as we do for "peek"
     # (non-destructive read).
@@ -557,6 +676,17 @@ class RedisExpireStorage(RedisStorage):
 
 class RedisPriorityQueue(object):
     priority = True
+    _last_ts = 0
+
+    def _next_ts(self, n=1):
+        # Reserve n consecutive microsecond timestamps. A batch may reserve
+        # timestamps slightly ahead of the clock, so timestamps are kept
+        # strictly increasing to ensure that anything enqueued afterwards by
+        # this storage is still ordered after the batch. Ordering between
+        # processes remains best-effort, as it is limited by their clocks.
+        ts = max(int(time.time() * 1e6), self._last_ts + 1)
+        self._last_ts = ts + n - 1
+        return ts
 
     def enqueue(self, data, priority=None):
         priority = 0 if priority is None else -priority
@@ -565,9 +695,21 @@ class RedisPriorityQueue(object):
         # the underlying data-type is a sorted-set, this also prevents multiple
         # identical messages, except they are enqueued on the same microsecond,
         # from being treated as a single item.
-        prefix = struct.pack('>Q', int(time.time() * 1e6))
+        prefix = struct.pack('>Q', self._next_ts())
         self.conn.zadd(self.queue_key, {prefix + data: priority})
 
+    def enqueue_many(self, items):
+        if not items:
+            return
+        # Increment the timestamp prefix for each item so that items with the
+        # same priority are dequeued in the order they were given.
+        ts = self._next_ts(len(items))
+        mapping = {}
+        for i, (data, priority) in enumerate(items):
+            priority = 0 if priority is None else -priority
+            mapping[struct.pack('>Q', ts + i) + data] = priority
+        self.conn.zadd(self.queue_key, mapping)
+
     def dequeue(self):
         if self.blocking:
             try:
@@ -726,6 +868,13 @@ class SqliteStorage(BaseSqlStorage):
         self.sql('insert into task (queue, data, priority) values (?, ?, ?)',
                  (self.name, to_blob(data), priority or 0), commit=True)
 
+    def enqueue_many(self, items):
+        with self.db(commit=True) as curs:
+            curs.executemany('insert into task (queue, data, priority) '
+                             'values (?, ?, ?)',
+                             [(self.name, to_blob(data), priority or 0)
+                              for data, priority in items])
+
     def dequeue(self):
         with self.db(commit=True) as curs:
             curs.execute('select id, data from task where queue = ? '
@@ -798,6 +947,16 @@ class SqliteStorage(BaseSqlStorage):
                        (self.name, key), results=True)
         return to_bytes(res[0][0]) if res else EmptyData
 
+    def peek_data_many(self, keys):
+        if not keys:
+            return []
+        plist = ','.join('?' * len(keys))
+        res = self.sql('select key, value from kv where queue = ? and key '
+                       'IN (%s)' % plist, [self.name] + list(keys),
+                       results=True)
+        accum = dict((k, to_bytes(v)) for k, v in res)
+        return [accum.get(key, EmptyData) for key in keys]
+
     def pop_data(self, key):
         with self.db(commit=True) as curs:
             curs.execute('select value from kv where queue = ? and key = ?',
@@ -3,7 +3,9 @@ import inspect
 
 from huey.api import MemoryHuey
 from huey.api import PeriodicTask
+from huey.api import Raw
 from huey.api import Result
+from huey.api import ResultGroup
 from huey.api import Task
 from huey.api import TaskWrapper
 from huey.api import crontab
@@ -88,6 +90,119 @@ class TestQueue(BaseTestCase):
         self.assertEqual(self.huey.result_count(), 1)
         self.assertTrue(r4._get() is None)
 
+    def test_enqueue_many(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        rg = task_a.map(range(3))
+        self.assertTrue(isinstance(rg, ResultGroup))
+        self.assertEqual(len(rg), 3)
+        self.assertEqual(len(self.huey), 3)
+
+        pipe = task_a.s(10).then(task_a)
+        r1, rg2 = self.huey.enqueue_many([task_a.s(5), pipe])
+        self.assertTrue(isinstance(r1, Result))
+        self.assertTrue(isinstance(rg2, ResultGroup))
+        self.assertEqual(len(self.huey), 5)
+
+        # Tasks are dequeued in the order they were given.
+        for _ in range(5):
+            self.execute_next()
+        self.assertEqual(rg.get(), [1, 2, 3])
+        self.assertEqual(r1(), 6)
+
+        self.execute_next()  # Pipeline continuation.
+        self.assertEqual(rg2.get(), [11, 12])
+        self.assertEqual(len(self.huey), 0)
+
+        self.huey.results = False
+        self.assertEqual(self.huey.enqueue_many([task_a.s(1)]), [None])
+        self.assertEqual(self.huey.enqueue_many([]), [])
+        self.assertEqual(len(self.huey), 1)
+
+    def test_task_slots(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        task = task_a.s(1)
+        self.assertFalse(hasattr(task, '__dict__'))
+        self.assertRaises(AttributeError, setattr, task, 'foo', 1)
+
+    def test_task_no_results(self):
+        @self.huey.task(results=False)
+        def task_a(n):
+            return n + 1
+
+        self.assertTrue(task_a(1) is None)
+        self.assertEqual(self.execute_next(), 2)
+        self.assertEqual(len(self.huey), 0)
+        self.assertEqual(self.huey.result_count(), 0)
+
+    def test_pipeline_no_results(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        @self.huey.task(results=False)
+        def task_b(n):
+            return n + 10
+
+        # Only the steps that store results are in the result group.
+        rg = self.huey.enqueue(task_a.s(1).then(task_b).then(task_a))
+        self.assertEqual(len(rg), 2)
+        for _ in range(3):
+            self.execute_next()
+        self.assertEqual(rg.get(), [2, 13])
+
+        rg = self.huey.enqueue(task_b.s(1).then(task_a))
+        self.assertEqual(len(rg), 1)
+        for _ in range(2):
+            self.execute_next()
+        self.assertEqual(rg.get(), [12])
+
+        self.assertTrue(self.huey.enqueue(task_b.s(1).then(task_b)) is None)
+        for _ in range(2):
+            self.execute_next()
+        self.assertEqual(self.huey.result_count(), 0)
+
+    def test_raw_result(self):
+        @self.huey.task()
+        def task_a(n):
+            return Raw(self.huey.serializer.serialize({'n': n}))
+
+        r = task_a(1)
+        self.assertTrue(isinstance(self.execute_next(), Raw))
+        self.assertEqual(r(), {'n': 1})
+
+        self.huey.put('k1', Raw(self.huey.serializer.serialize('v1')))
+        self.assertEqual(self.huey.get_raw('k1', peek=True),
+                         self.huey.serializer.serialize('v1'))
+        self.assertEqual(self.huey.get('k1'), 'v1')
+
+    def test_raw_result_pipeline(self):
+        @self.huey.task()
+        def task_a(n):
+            return Raw(self.huey.serializer.serialize(n + 1))
+
+        @self.huey.task()
+        def task_b(n):
+            return n * 10
+
+        hook_values = []
+
+        @self.huey.post_execute()
+        def hook(task, task_value, exc):
+            hook_values.append(task_value)
+
+        # The next step and the post-execute hook receive the value itself.
+        rg = self.huey.enqueue(task_a.s(1).then(task_b))
+        self.assertTrue(isinstance(self.execute_next(), Raw))
+        self.assertEqual(self.execute_next(), 20)
+        self.assertEqual(rg.get(), [2, 20])
+        self.assertEqual(hook_values, [2, 20])
+
     def test_scheduling(self):
         @self.huey.task()
         def task_a(n):
@@ -625,6 +740,30 @@ class TestQueue(BaseTestCase):
         err = self.trap_exception(re)
         self.assertEqual(err.metadata['error'], 'TestError(uh-oh)')
         self.assertEqual(err.metadata['retries'], 0)
+        self.assertTrue('raise TestError' in err.metadata['traceback'])
+
+    def test_task_error_traceback_limit(self):
+        # Alternate between two functions so that Python does not collapse
+        # the repeated frames when formatting the traceback.
+        def recurse_a(n):
+            if n == 0:
+                raise TestError('deep')
+            return recurse_b(n - 1)
+
+        def recurse_b(n):
+            return recurse_a(n - 1)
+
+        @self.huey.task()
+        def task_e(n):
+            return recurse_a(n)
+
+        re = task_e(200)
+        self.assertTrue(self.execute_next() is None)
+
+        # The innermost frames are kept and the traceback is bounded.
+        tb = self.trap_exception(re).metadata['traceback']
+        self.assertTrue("raise TestError('deep')" in tb)
+        self.assertEqual(tb.count('  File '), 50)
 
         self.assertEqual(self.huey.result_count(), 0)
         self.assertEqual(len(self.huey), 0)
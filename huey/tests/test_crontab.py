@@ -113,6 +113,15 @@ class TestCrontab(unittest.TestCase):
         # fails validation on minute
         self.assertFalse(validate(datetime.datetime(2011, 1, 1, 4, 6)))
 
+    def test_crontab_full_ranges(self):
+        # Explicit full ranges behave the same as "*".
+        validate = crontab(month='1-12', day='1-31', day_of_week='0-6',
+                           hour='3', minute='0')
+        start = datetime.datetime(2011, 1, 1)
+        for x in range(0, 60 * 24 * 14, 15):
+            dt = start + datetime.timedelta(minutes=x)
+            self.assertEqual(validate(dt), dt.hour == 3 and dt.minute == 0)
+
     def test_invalid_crontabs(self):
         # check invalid configurations are detected and reported
         self.assertRaises(ValueError, crontab, minute='61')
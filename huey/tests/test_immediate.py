@@ -116,6 +116,16 @@ class TestImmediate(BaseTestCase):
         self.assertEqual(len(self.huey), 0)
         self.assertEqual(self.huey.result_count(), 0)
 
+    def test_swap_immediate_reuses_storage(self):
+        huey = MemoryHuey(utc=False)
+        live = huey.storage
+
+        huey.immediate = True
+        self.assertFalse(huey.storage is live)
+
+        huey.immediate = False
+        self.assertTrue(huey.storage is live)
+
     def test_map(self):
         @self.huey.task()
         def task_a(n):
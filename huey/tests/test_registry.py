@@ -61,6 +61,30 @@ class TestRegistry(BaseTestCase):
         self.assertTrue(task2.expires is None)
         self.assertTrue(task2.expires_resolved is None)
 
+    def test_serialize_task(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        @self.huey.task(name='task_b')
+        def task_a2(n):
+            return n + 2
+
+        for _ in range(2):
+            t = task_a.s(1).then(task_a2).error(task_a, 3)
+            t2 = self.huey.deserialize_task(self.huey.serialize_task(t))
+            self.assertEqual(t2, t)
+            self.assertEqual(t2.args, (1,))
+            self.assertEqual(t2.on_complete, t.on_complete)
+            self.assertEqual(t2.on_error, t.on_error)
+            self.assertEqual(t2.on_error.args, (3,))
+
+        tc = task_a.task_class
+        self.assertEqual(self.registry.task_to_string(tc),
+                         '%s.%s' % (tc.__module__, tc.__name__))
+        self.assertEqual(self.registry.task_to_string(task_a2.task_class),
+                         '%s.task_b' % tc.__module__)
+
     def test_missing_task(self):
         @self.huey.task()
         def task_a():
@@ -78,6 +102,22 @@ class TestRegistry(BaseTestCase):
         # Similarly, we can no longer serialize the task to a message.
         self.assertRaises(HueyException, self.registry.create_message, task)
 
+    def test_task_key(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        tc = task_a.task_class
+        self.assertEqual(self.registry.task_key(tc, 'rt'),
+                         'rt:%s' % self.registry.task_to_string(tc))
+        self.assertTrue((tc, 'rt') in self.registry._task_keys)
+
+        # Cached keys are dropped when the task is unregistered.
+        self.assertTrue(task_a.unregister())
+        self.assertFalse((tc, 'rt') in self.registry._task_keys)
+        self.registry.task_key(tc, 'rt')
+        self.assertFalse((tc, 'rt') in self.registry._task_keys)
+
     def test_periodic_tasks(self):
         def task_fn(): pass
         self.huey.task(name='a')(task_fn)
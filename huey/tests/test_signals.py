@@ -151,6 +151,22 @@ class TestSignals(BaseTestCase):
         self.assertEqual(extra_state, [3, 1])
         self.assertSignals([SIGNAL_EXECUTING, SIGNAL_COMPLETE])
 
+    def test_has_receivers(self):
+        signal = Signal()
+        self.assertFalse(signal.has_receivers(SIGNAL_COMPLETE))
+
+        def handler(signal, task): pass
+        signal.connect(handler, SIGNAL_COMPLETE)
+        self.assertTrue(signal.has_receivers(SIGNAL_COMPLETE))
+        self.assertFalse(signal.has_receivers(SIGNAL_ERROR))
+
+        signal.disconnect(handler)
+        self.assertFalse(signal.has_receivers(SIGNAL_COMPLETE))
+
+        signal.connect(handler)  # Receives any signal.
+        self.assertTrue(signal.has_receivers(SIGNAL_COMPLETE))
+        self.assertTrue(signal.has_receivers(SIGNAL_ERROR))
+
     def test_multi_handlers(self):
         state1 = []
         state2 = []
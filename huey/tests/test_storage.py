@@ -4,6 +4,7 @@ import itertools
 import os
 import shutil
 import threading
+import time
 import unittest
 try:
     from queue import Queue
@@ -128,6 +129,17 @@ class StorageTests(object):
         self.assertEqual(self.s.result_store_size(), 0)
         self.assertEqual(self.s.result_items(), {})
 
+    def test_peek_data_many(self):
+        self.assertEqual(self.s.peek_data_many([]), [])
+        self.s.put_data(b'k1', b'v1')
+        self.s.put_data(b'k2', b'')
+        self.assertEqual(self.s.peek_data_many([b'k2', b'kx', b'k1']),
+                         [b'', EmptyData, b'v1'])
+        self.assertEqual(self.s.peek_data_many([b'kx']), [EmptyData])
+
+        # Reads are non-destructive.
+        self.assertEqual(self.s.result_store_size(), 2)
+
     def test_priority(self):
         if not self.s.priority:
             raise unittest.SkipTest('priority support required')
@@ -141,6 +153,55 @@ class StorageTests(object):
                     b'i1-None', b'i3-None', b'i5-None', b'i7-None', b'i9-0']
         self.assertEqual([self.s.dequeue() for _ in range(10)], expected)
 
+    def test_enqueue_many(self):
+        self.s.enqueue_many([])
+        self.assertEqual(self.s.queue_size(), 0)
+
+        self.s.enqueue_many([(('item-%d' % i).encode(), None)
+                             for i in range(3)])
+        self.s.enqueue(b'item-3')
+        self.assertEqual(self.s.queue_size(), 4)
+        self.assertEqual(self.s.enqueued_items(),
+                         [b'item-0', b'item-1', b'item-2', b'item-3'])
+        self.assertEqual([self.s.dequeue() for _ in range(4)],
+                         [b'item-0', b'item-1', b'item-2', b'item-3'])
+
+        if self.s.priority:
+            self.s.enqueue_many([(b'p1', 1), (b'p0', None), (b'p3', 3),
+                                 (b'p0-2', None)])
+            self.assertEqual([self.s.dequeue() for _ in range(4)],
+                             [b'p3', b'p1', b'p0', b'p0-2'])
+
+        # An item enqueued right after a large batch is ordered after it.
+        items = [(('batch-%d' % i).encode(), None) for i in range(1000)]
+        self.s.enqueue_many(items)
+        self.s.enqueue(b'after')
+        self.assertEqual(self.s.enqueued_items()[-2:], [b'batch-999', b'after'])
+        self.s.flush_queue()
+
+    def test_revoked_while_running(self):
+        state = []
+
+        @self.huey.task(retries=1, context=True)
+        def task_a(n, task=None):
+            if not state:
+                # Revoke this instance while it is running, then fail so that
+                # the task is retried.
+                state.append(n)
+                self.huey.revoke_by_id(task.id)
+                raise ValueError('retry me')
+            return n + 1
+
+        r = task_a(1)
+        self.assertTrue(self.execute_next() is None)
+        self.assertEqual(len(self.huey), 1)  # Retry was enqueued.
+
+        # The revoke flag is cleared once execution finishes, so the retry is
+        # executed normally.
+        self.assertFalse(r.is_revoked())
+        self.assertEqual(self.execute_next(), 2)
+        self.assertEqual(r(), 2)
+
     def test_consumer_integration(self):
         @self.huey.task()
         def task_a(n):
@@ -255,6 +316,87 @@ class TestRedisExpireStorage(StorageTests, BaseTestCase):
         self.assertEqual(self.huey.result_count(), 2)  # r1 and r3 still there.
 
 
+class TestRedisNotifyResults(BaseTestCase):
+    def get_huey(self):
+        return RedisHuey(utc=False, notify_results=True)
+
+    def setUp(self):
+        super(TestRedisNotifyResults, self).setUp()
+        self.s = self.huey.storage
+        self.s.flush_all()
+
+    def tearDown(self):
+        super(TestRedisNotifyResults, self).tearDown()
+        self.s.flush_all()
+
+    def test_wait_for_data(self):
+        # Data already present is detected without waiting.
+        self.s.put_data(b'k1', b'v1', is_result=True)
+        start = time.time()
+        self.s.wait_for_data(b'k1', 0.1, 5)
+        self.assertTrue(time.time() - start < 0.5)
+
+        # Waiting on a key that never receives data times out.
+        start = time.time()
+        self.s.wait_for_data(b'k2', 0.1, 0.2)
+        self.assertTrue(time.time() - start >= 0.2)
+
+        # Writing the data wakes up the waiter.
+        def put_data():
+            time.sleep(0.2)
+            self.s.put_data(b'k3', b'v3', is_result=True)
+
+        t = threading.Thread(target=put_data)
+        t.start()
+        start = time.time()
+        self.s.wait_for_data(b'k3', 0.1, 5)
+        self.assertTrue(time.time() - start < 0.8)
+        t.join()
+
+    def test_wait_for_data_without_notify(self):
+        # A result written by a storage that does not publish notifications is
+        # still picked up, at the interval requested by the caller.
+        writer = type(self.s)(self.s.name)
+
+        def put_data():
+            time.sleep(0.2)
+            writer.put_data(b'k1', b'v1', is_result=True)
+
+        t = threading.Thread(target=put_data)
+        t.start()
+        start = time.time()
+        self.s.wait_for_data(b'k1', 0.1, 5)
+        self.assertTrue(time.time() - start < 0.5)
+        t.join()
+
+    def test_blocking_result(self):
+        @self.huey.task()
+        def task_a(n):
+            return n + 1
+
+        r = task_a(1)
+
+        def run_task():
+            time.sleep(0.5)
+            self.huey.execute(self.huey.dequeue())
+
+        # Polling with this backoff would not check again until 1.1 seconds
+        # have elapsed, so the result must have been delivered by the notify.
+        t = threading.Thread(target=run_task)
+        t.start()
+        start = time.time()
+        self.assertEqual(r.get(blocking=True, timeout=5, backoff=10,
+                               max_delay=5), 2)
+        self.assertTrue(time.time() - start < 1.0)
+        t.join()
+
+
+class TestRedisExpireNotifyResults(TestRedisNotifyResults):
+    def get_huey(self):
+        return RedisExpireHuey(expire_time=3600, utc=False,
+                               notify_results=True)
+
+
 def get_redis_version():
     return int(Redis().info()['redis_version'].split('.', 1)[0])
 
@@ -23,6 +23,17 @@ else:
 Error = namedtuple('Error', ('metadata',))
 
 
+class Raw(object):
+    """
+    Wrapper for data that has already been serialized using the Huey
+    instance's serializer. Raw data is written to the result store as-is.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
 class UTC(datetime.tzinfo):
     zero = datetime.timedelta(0)
 